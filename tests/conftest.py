@@ -1,6 +1,7 @@
 import csv
 import json
 import os
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 import pytest
@@ -109,3 +110,31 @@ def write_result(row, filename, headers=None):
         if not file_exists:
             writer.writeheader()
         writer.writerow(row)
+
+
+@contextmanager
+def open_csv_writer(filename, headers, flush_every=32):
+    """
+    Open a CSV file in the results directory once and yield a row writer.
+    The header is written a single time and the file is flushed every
+    `flush_every` rows instead of being reopened for each result.
+    """
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    filepath = os.path.join(RESULT_DIR, os.path.basename(filename))
+    file_exists = os.path.isfile(filepath)
+
+    with open(filepath, "a", newline="", buffering=1 << 20) as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=headers)
+        if not file_exists:
+            writer.writeheader()
+
+        class Writer:
+            rows_written = 0
+
+            def writerow(self, row):
+                writer.writerow(row)
+                self.rows_written += 1
+                if self.rows_written % flush_every == 0:
+                    csvfile.flush()
+
+        yield Writer()
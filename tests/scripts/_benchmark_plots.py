@@ -0,0 +1,303 @@
+"""
+Plotting helpers for visualize_benchmark.py. Kept in a separate module so that
+matplotlib, seaborn and Pillow are only imported when plots are rendered.
+"""
+
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+from matplotlib import colormaps, font_manager
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from matplotlib.ticker import FuncFormatter, MultipleLocator
+from PIL import Image, ImageDraw, ImageFont
+
+from tests.conftest import IMAGES_DIR
+from tests.utils.commons import get_service_config
+
+# --- Configuration ---
+DETAILED_PERFORMANCE_DIR = os.path.join(IMAGES_DIR, "detailed_performance")
+DASHBOARD_TITLE = "Routing Services Performance Dashboard"
+
+# zlib level for the PNGs; fast by default, raise it (up to 9) for smaller files
+PNG_COMPRESS_LEVEL = int(os.environ.get("BENCHMARK_PNG_COMPRESS_LEVEL", "1"))
+
+# A simple map for service colors and labels
+SERVICE_CONFIG = get_service_config()
+
+# Display labels per service, resolved once
+LABEL_MAP = {
+    service: config.get("label", service.upper())
+    for service, config in SERVICE_CONFIG.items()
+}
+
+# Create a color palette dictionary for seaborn from the dynamic config
+COLOR_PALETTE = {service: config["color"] for service, config in SERVICE_CONFIG.items()}
+
+# Set style for better visualizations
+plt.style.use(
+    "seaborn-v0_8-whitegrid"
+    if "seaborn-v0_8-whitegrid" in plt.style.available
+    else "default"
+)
+# Files only: use the non-interactive Agg backend and a bundled font, and let
+# Agg merge near-collinear path segments when rendering
+plt.switch_backend("Agg")
+plt.rcParams.update(
+    {
+        "font.family": "DejaVu Sans",
+        "path.simplify": True,
+        "path.simplify_threshold": 1.0,
+        "agg.path.chunksize": 10000,
+    }
+)
+
+# --- INDIVIDUAL PLOTTING FUNCTIONS ---
+
+
+def get_label(service_name):
+    """Safely get a service label from the config."""
+    return LABEL_MAP.get(service_name, service_name.upper())
+
+
+def observed_categories(series):
+    """Categories of a categorical column that actually occur, in category order."""
+    return series.cat.remove_unused_categories().cat.categories.tolist()
+
+
+def relabel(ax, services):
+    """Put the display labels of the services on consecutive x-axis ticks."""
+    ax.set_xticks(range(len(services)), labels=[get_label(s) for s in services])
+    ax.grid(False, axis="x")
+
+
+def plot_service_bars(ax, summary, metric, cmap_name=None):
+    """
+    Draw one bar per service from the pre-aggregated summary. With a colormap,
+    services are split into side-by-side bars per cost type.
+    """
+    services = observed_categories(summary["service"])
+    if cmap_name is None:
+        # Count-weighted mean of the group means, equal to the mean over all rows
+        counts = summary[f"{metric}_count"]
+        by_service = summary["service"]
+        means = (summary[metric] * counts).groupby(
+            by_service, observed=True
+        ).sum() / counts.groupby(by_service, observed=True).sum()
+        ax.bar(
+            range(len(services)),
+            means.reindex(services),
+            width=0.8,
+            color=[COLOR_PALETTE.get(s) for s in services],
+        )
+        relabel(ax, services)
+        return
+
+    cost_types = observed_categories(summary["cost_type"])
+    # Same sampling of the colormap as seaborn's named palettes
+    colors = colormaps[cmap_name](np.linspace(0, 1, len(cost_types) + 2)[1:-1])
+    cost_colors = dict(zip(cost_types, colors, strict=True))
+
+    for x, service in enumerate(services):
+        rows = summary[summary["service"] == service].sort_values("cost_type")
+        width = 0.8 / len(rows)
+        for j, (cost_type, value) in enumerate(
+            zip(rows["cost_type"], rows[metric], strict=True)
+        ):
+            ax.bar(
+                x - 0.4 + width * (j + 0.5),
+                value,
+                width=width,
+                color=cost_colors[cost_type],
+            )
+    relabel(ax, services)
+    ax.legend(
+        handles=[Patch(color=cost_colors[c], label=c) for c in cost_types],
+        title="Cost Type",
+    )
+
+
+def create_response_time_plot(df, summary, ax):
+    """Plots response time distribution."""
+    # Box statistics from vectorized grouped passes instead of seaborn's sort
+    times = df["avg_time_ms"]
+    services = df["service"]
+    quantiles = (
+        times.groupby(services, observed=True).quantile([0.25, 0.5, 0.75]).unstack()
+    )
+    fence = 1.5 * (quantiles[0.75] - quantiles[0.25])
+    lower = (quantiles[0.25] - fence).reindex(services).to_numpy()
+    upper = (quantiles[0.75] + fence).reindex(services).to_numpy()
+    inside = times.between(lower, upper).to_numpy()
+    # Whiskers end at the most extreme samples within the 1.5 IQR fences
+    whiskers = times.where(inside).groupby(services, observed=True).agg(["min", "max"])
+    outliers = ~inside & times.notna().to_numpy()
+    fliers = {
+        service: group.to_numpy()
+        for service, group in times[outliers].groupby(services[outliers], observed=True)
+    }
+    box_stats = [
+        {
+            "label": get_label(service),
+            "med": row[0.5],
+            "q1": row[0.25],
+            "q3": row[0.75],
+            "whislo": whiskers.at[service, "min"],
+            "whishi": whiskers.at[service, "max"],
+            "fliers": fliers.get(service, np.empty(0)),
+        }
+        for service, row in quantiles.iterrows()
+    ]
+    artists = ax.bxp(
+        box_stats,
+        patch_artist=True,
+        widths=0.8,
+        medianprops={"color": "0.2"},
+        flierprops={"marker": "d", "markersize": 4, "markerfacecolor": "0.3"},
+    )
+    for patch, service in zip(artists["boxes"], quantiles.index, strict=True):
+        patch.set_facecolor(COLOR_PALETTE.get(service))
+    ax.set_title("Response Time Distribution")
+    ax.set_xlabel(None)
+    ax.set_ylabel("Time (ms)")
+
+
+def create_throughput_plot(df, summary, ax):
+    """Plots average throughput."""
+    plot_service_bars(ax, summary, "throughput_rps")
+    ax.set_title("Average Throughput (Requests/Sec)")
+    ax.set_xlabel(None)
+    ax.set_ylabel("RPS (Higher is Better)")
+
+
+def create_cpu_plot(df, summary, ax):
+    """Plots CPU usage, differentiating server vs. client cost."""
+    plot_service_bars(ax, summary, "cpu_s", cmap_name="viridis")
+    ax.set_title("CPU Usage: Server vs. Client Cost")
+    ax.set_xlabel(None)
+    ax.set_ylabel("CPU Time (s, log scale)")
+    ax.set_yscale("log")
+
+
+def create_memory_plot(df, summary, ax):
+    """Plots memory usage, differentiating server vs. client cost."""
+    plot_service_bars(ax, summary, "memory_mb", cmap_name="magma")
+    ax.set_title("Memory Usage: Peak Server vs. Client Delta")
+    ax.set_xlabel(None)
+    ax.set_ylabel("Memory (MB, log scale)")
+    ax.set_yscale("log")
+
+
+DECADE_FORMATTER = FuncFormatter(lambda value, _pos: f"$10^{{{value:g}}}$")
+
+
+def create_efficiency_scatter_plot(df, summary, ax):
+    """Creates a scatter plot of CPU vs Memory, using custom markers."""
+    ax.set_title("Resource Efficiency (CPU vs. Memory)")
+    sns.scatterplot(
+        data=df,
+        x="log_cpu_s",
+        y="log_memory_mb",
+        hue="service",
+        style="cost_type",
+        # Only iterate over the services and cost types that were benchmarked
+        hue_order=observed_categories(df["service"]),
+        style_order=observed_categories(df["cost_type"]),
+        palette=COLOR_PALETTE,
+        ax=ax,
+        s=100,  # size of markers
+        alpha=0.8,
+        rasterized=True,  # one raster blit instead of a path per marker
+    )
+    ax.set_xlabel("CPU Time (s, log scale)")
+    ax.set_ylabel("Memory (MB, log scale)")
+    # Data is already in log10 space: one tick per decade, labelled as a power
+    for axis in (ax.xaxis, ax.yaxis):
+        axis.set_major_locator(MultipleLocator(1))
+        axis.set_major_formatter(DECADE_FORMATTER)
+    ax.grid(True, which="both", ls="--", linewidth=0.5)
+
+
+# --- MAIN DASHBOARD AND SAVING LOGIC ---
+
+
+def save_plot(fig, ax, plot_func, df, summary, filename):
+    """Helper to save a single plot."""
+    plot_func(df, summary, ax)
+    fig.tight_layout()  # Simple layout for single plots
+    plot_path = os.path.join(DETAILED_PERFORMANCE_DIR, filename)
+    fig.savefig(
+        plot_path,
+        dpi=150,
+        pil_kwargs={"compress_level": PNG_COMPRESS_LEVEL, "optimize": False},
+    )
+
+
+# Plots saved individually and tiled into the dashboard, keyed by file name
+PLOT_DEFINITIONS = {
+    "01_response_time.png": create_response_time_plot,
+    "02_throughput.png": create_throughput_plot,
+    "03_cpu_usage.png": create_cpu_plot,
+    "04_memory_usage.png": create_memory_plot,
+    "05_efficiency_scatter.png": create_efficiency_scatter_plot,
+}
+
+# Data and a reusable figure for the detailed plot workers, set once per process
+_worker_data = {}
+
+
+def init_plot_worker(df, summary):
+    """Receive the plot data once per worker process and create its figure."""
+    _worker_data["df"] = df
+    _worker_data["summary"] = summary
+
+    # Figures bound directly to an Agg canvas stay out of the pyplot registry
+    fig = Figure(figsize=(8, 6))
+    FigureCanvasAgg(fig)
+    _worker_data["fig"] = fig
+    _worker_data["ax"] = fig.add_subplot()
+
+
+def save_detailed_plot(filename):
+    """Worker task: render and save a single detailed plot."""
+    ax = _worker_data["ax"]
+    ax.clear()
+    save_plot(
+        _worker_data["fig"],
+        ax,
+        PLOT_DEFINITIONS[filename],
+        _worker_data["df"],
+        _worker_data["summary"],
+        filename,
+    )
+    return filename
+
+
+def compose_dashboard(path, columns=2, title_height=120):
+    """Tile the saved detailed plots into a single dashboard image."""
+    tiles = []
+    for filename in PLOT_DEFINITIONS:
+        with Image.open(os.path.join(DETAILED_PERFORMANCE_DIR, filename)) as tile:
+            tiles.append(tile.convert("RGB"))
+
+    tile_width, tile_height = tiles[0].size
+    rows = -(-len(tiles) // columns)
+    dashboard = Image.new(
+        "RGB", (columns * tile_width, title_height + rows * tile_height), "white"
+    )
+    for i, tile in enumerate(tiles):
+        row, column = divmod(i, columns)
+        dashboard.paste(tile, (column * tile_width, title_height + row * tile_height))
+
+    font_path = font_manager.findfont(font_manager.FontProperties(weight="bold"))
+    ImageDraw.Draw(dashboard).text(
+        (dashboard.width // 2, title_height // 2),
+        DASHBOARD_TITLE,
+        fill="black",
+        font=ImageFont.truetype(font_path, 48),
+        anchor="mm",
+    )
+    dashboard.save(path, compress_level=PNG_COMPRESS_LEVEL)
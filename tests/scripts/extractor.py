@@ -1,30 +1,19 @@
 import csv
-import glob
+import io
 import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 
+# Matches MOTIS one-to-all response files and captures their identifier
+IDENTIFIER_PATTERN = re.compile(r"motis_one_to_all_(.+)\.json$")
 
-def process_file(input_filepath, output_csv_path, output_geojson_path):
-    """
-    Processes a single JSON file to create:
-    1. A CSV file from the "all" list.
-    2. A GeoJSON file containing both the "one" (origin) and "all" (destinations) points.
-    """
-    try:
-        with open(input_filepath, "r", encoding="utf-8") as f:
-            file_content = f.read()
-            if not file_content.strip().startswith("{"):
-                file_content = "{" + file_content + "}"
-            data = json.loads(file_content)
-    except FileNotFoundError:
-        print(f"Error: The file '{input_filepath}' was not found.")
-        return
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from '{input_filepath}'.")
-        return
+# Write buffer for GeoJSON output, so large files are flushed in few syscalls
+GEOJSON_BUFFER_SIZE = 4 << 20
 
-    # --- 1. Extract data for and write the CSV file ---
-    all_items = data.get("all", [])
+
+def _write_csv(all_items, output_csv_path):
+    """Write the "all" list to a CSV file and return the number of rows."""
     csv_headers = ["stopId", "lat", "long", "duration"]
 
     with open(output_csv_path, "w", newline="", encoding="utf-8") as csvfile:
@@ -40,55 +29,99 @@ def process_file(input_filepath, output_csv_path, output_geojson_path):
                     "duration": item.get("duration"),
                 }
             )
-    print(f"✔ Extracted {len(all_items)} records to '{output_csv_path}'.")
-
-    # --- 2. Build the list of features for the GeoJSON file ---
-    features = []
-
-    # Add the "one" object as the ORIGIN feature
-    one_data = data.get("one")
-    if one_data and "lat" in one_data and "lon" in one_data:
-        origin_feature = {
-            "type": "Feature",
-            "geometry": {
-                "type": "Point",
-                "coordinates": [one_data["lon"], one_data["lat"]],
-            },
-            "properties": {
-                "name": one_data.get("name"),
-                "departure": one_data.get("departure"),
-                "type": "ORIGIN",  # Custom property to identify the origin
-            },
-        }
-        features.append(origin_feature)
-
-    # Add each item from the "all" list as a DESTINATION feature
-    for item in all_items:
-        place = item.get("place", {})
-        if place and "lat" in place and "lon" in place:
-            destination_feature = {
+    return len(all_items)
+
+
+def _write_geojson(one_data, all_items, output_geojson_path):
+    """
+    Stream the origin and destination points to a GeoJSON file feature by
+    feature and return the number of features written.
+    """
+    num_features = 0
+
+    fd = os.open(output_geojson_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    with io.BufferedWriter(
+        io.FileIO(fd, "w"), buffer_size=GEOJSON_BUFFER_SIZE
+    ) as geojson_file:
+        geojson_file.write(b'{"type": "FeatureCollection", "features": [\n')
+
+        # Add the "one" object as the ORIGIN feature
+        if one_data and "lat" in one_data and "lon" in one_data:
+            origin_feature = {
                 "type": "Feature",
                 "geometry": {
                     "type": "Point",
-                    "coordinates": [place["lon"], place["lat"]],
+                    "coordinates": [one_data["lon"], one_data["lat"]],
                 },
                 "properties": {
-                    "stopId": place.get("stopId"),
-                    "duration": item.get("duration"),
-                    "name": place.get("name"),
-                    "type": "DESTINATION",  # Custom property
+                    "name": one_data.get("name"),
+                    "departure": one_data.get("departure"),
+                    "type": "ORIGIN",  # Custom property to identify the origin
                 },
             }
-            features.append(destination_feature)
+            geojson_file.write(json.dumps(origin_feature).encode("utf-8"))
+            num_features += 1
+
+        # Add each item from the "all" list as a DESTINATION feature
+        for item in all_items:
+            place = item.get("place", {})
+            if place and "lat" in place and "lon" in place:
+                destination_feature = {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [place["lon"], place["lat"]],
+                    },
+                    "properties": {
+                        "stopId": place.get("stopId"),
+                        "duration": item.get("duration"),
+                        "name": place.get("name"),
+                        "type": "DESTINATION",  # Custom property
+                    },
+                }
+                if num_features:
+                    geojson_file.write(b",\n")
+                geojson_file.write(json.dumps(destination_feature).encode("utf-8"))
+                num_features += 1
+
+        geojson_file.write(b"\n]}\n")
+
+    return num_features
+
+
+def process_file(input_filepath, output_csv_path, output_geojson_path):
+    """
+    Processes a single JSON file to create:
+    1. A CSV file from the "all" list.
+    2. A GeoJSON file containing both the "one" (origin) and "all" (destinations) points.
+    """
+    try:
+        with open(input_filepath, "r", encoding="utf-8") as f:
+            file_content = f.read()
+            if not file_content.strip().startswith("{"):
+                file_content = "{" + file_content + "}"
+            data = json.loads(file_content)
+    except FileNotFoundError:
+        print(f"Error: The file '{input_filepath}' was not found.")
+        return
+    except json.JSONDecodeError:
+        print(f"Error: Could not decode JSON from '{input_filepath}'.")
+        return
 
-    # --- 3. Write the complete GeoJSON file ---
-    geojson_structure = {"type": "FeatureCollection", "features": features}
+    all_items = data.get("all", [])
 
-    with open(output_geojson_path, "w", encoding="utf-8") as geojson_file:
-        json.dump(geojson_structure, geojson_file, indent=2)
+    # The two outputs are independent, so write them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        csv_future = executor.submit(_write_csv, all_items, output_csv_path)
+        geojson_future = executor.submit(
+            _write_geojson, data.get("one"), all_items, output_geojson_path
+        )
+        num_records = csv_future.result()
+        num_features = geojson_future.result()
 
+    print(f"✔ Extracted {num_records} records to '{output_csv_path}'.")
     print(
-        f"✔ Created GeoJSON file '{output_geojson_path}' with {len(features)} features (1 origin, {len(all_items)} destinations)."
+        f"✔ Created GeoJSON file '{output_geojson_path}' with {num_features} features (1 origin, {len(all_items)} destinations)."
     )
 
 
@@ -102,21 +135,26 @@ if __name__ == "__main__":
     print(f"Input directory:  '{input_directory}'")
     print(f"Output directory: '{output_directory}'\n")
 
-    search_pattern = os.path.join(input_directory, "motis_one_to_all_*.json")
-    input_files = glob.glob(search_pattern)
+    # Single directory pass: filter and extract identifiers with one regex match
+    input_files = []
+    if os.path.isdir(input_directory):
+        with os.scandir(input_directory) as entries:
+            input_files = [
+                (entry.path, entry.name, match.group(1))
+                for entry in entries
+                if entry.is_file() and (match := IDENTIFIER_PATTERN.match(entry.name))
+            ]
 
     if not input_files:
-        print(f"Error: No files found matching the pattern '{search_pattern}'.")
+        print(
+            f"Error: No files found matching '{IDENTIFIER_PATTERN.pattern}' in '{input_directory}'."
+        )
     else:
         print(f"Found {len(input_files)} files to process.")
 
-    for input_filepath in input_files:
-        filename = os.path.basename(input_filepath)
+    for input_filepath, filename, identifier in input_files:
         print(f"\n--- Processing file: {filename} ---")
 
-        base_name = filename.removesuffix(".json")
-        identifier = base_name.replace("motis_one_to_all_", "")
-
         output_csv_file = os.path.join(
             output_directory, f"extracted_data_{identifier}.csv"
         )
@@ -4,9 +4,15 @@ Clean routing comparison with proper separation of transport vs driving modes.
 - Driving: Google (driving), Valhalla-NoGTFS (auto)
 """
 
+import argparse
+import functools
+import hashlib
+import json
+import os
+import shelve
 from datetime import datetime
 
-from tests.conftest import write_result
+from tests.conftest import RESULT_DIR, TIME_BENCH, open_csv_writer
 from tests.utils.commons import coordinates_list
 from tests.utils.models import RouteSummary
 from tests.utils.query_helpers import (
@@ -20,10 +26,24 @@ from tests.utils.query_helpers import (
 # Configuration flags to enable/disable modes for comparison
 DRIVE = True
 TRANSPORT = True
+USE_CACHE = False
+
+# Opt-in on-disk cache of raw service responses, keyed by service, params,
+# departure time and route
+ROUTE_CACHE_PATH = os.path.join(RESULT_DIR, ".route_cache")
 
 TRANSPORT_COMPARISON_CSV = "transport_comparison.csv"
 DRIVING_COMPARISON_CSV = "driving_comparison.csv"
 
+
+def normalize_query_result(service_name, result):
+    """Normalize a QueryResult into a (data, response_size) tuple."""
+    if result.success:
+        return result.data, result.response_size
+    print(f"❌ {service_name} query failed: {result.error_message}")
+    return None, None
+
+
 # Transport services (public transit)
 TRANSPORT_SERVICES = {
     "motis": {
@@ -35,12 +55,14 @@ TRANSPORT_SERVICES = {
             "detailedTransfers": False,
         },
         "routes_path": ["result", "itineraries"],
+        "normalize": normalize_query_result,
     },
     "google": {
         "query_func": query_google,
         "extract_func": extract_google_route_summary,
         "query_params": {"mode": "transit"},
         "routes_path": ["routes"],
+        "normalize": normalize_query_result,
     },
 }
 
@@ -51,35 +73,85 @@ DRIVING_SERVICES = {
         "extract_func": extract_google_driving_route_summary,
         "query_params": {"mode": "driving"},
         "routes_path": ["routes"],
+        "normalize": normalize_query_result,
     },
 }
 
 # EXCLUDE otp for now, it is haldelen in test_otp_routing.py
 
+# CSV column fields per service (RouteSummary fields + standard fields)
+COLUMN_FIELDS = (
+    "duration",
+    "distance",
+    "modes",
+    "vehicle_lines",
+    "response_size",
+    "num_routes",
+)
+
+
+def build_column_keys(service_name, mode):
+    """Map each column field to its CSV column name for a service and mode."""
+    return {field: f"{service_name}_{field}_{mode}" for field in COLUMN_FIELDS}
+
+
+# Column names are built once per (service, mode) instead of on every row
+COLUMN_KEYS = {
+    **{
+        (name, "transport"): build_column_keys(name, "transport")
+        for name in TRANSPORT_SERVICES
+    },
+    **{
+        (name, "driving"): build_column_keys(name, "driving")
+        for name in DRIVING_SERVICES
+    },
+}
+
+
+def route_cache_key(service_name, params, origin, destination):
+    """
+    Build a stable cache key for a service query. The effective departure time
+    is part of the key, so results for an earlier TIME_BENCH are never replayed.
+    """
+    departure_time = params.get("time", TIME_BENCH)
+    raw = json.dumps(
+        [service_name, params, departure_time, origin, destination],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(raw.encode("utf-8")).hexdigest()
+
+
+def query_service_for_mode(
+    service_name, service_config, origin, destination, cache=None
+):
+    """
+    Query a service with its specific configuration.
+    If a cache is given, responses containing routes are stored in and served
+    from it; errors and empty results are always queried again.
+    """
+    if cache is not None:
+        key = route_cache_key(
+            service_name, service_config["query_params"], origin, destination
+        )
+        if key in cache:
+            return cache[key]
+
+        result, size = query_service_for_mode(
+            service_name, service_config, origin, destination
+        )
+        if get_route_count(service_config, result) > 0:
+            cache[key] = (result, size)
+        return result, size
 
-def query_service_for_mode(service_name, service_config, origin, destination):
-    """Query a service with its specific configuration."""
     try:
         query_func = service_config["query_func"]
-        params = service_config["query_params"].copy()
-
-        # Call the query function
-        result = query_func(origin, destination, **params)
-
-        # Handle different return types
-        if hasattr(result, "success"):
-            # QueryResult object
-            if result.success:
-                return result.data, result.response_size
-            else:
-                print(f"❌ {service_name} query failed: {result.error_message}")
-                return None, None
-        elif isinstance(result, tuple) and len(result) == 2:
-            # Tuple format (data, size) - works for OTP, Google, MOTIS
-            return result[0], result[1]
-        else:
-            print(f"⚠️ Unexpected return format from {service_name}: {type(result)}")
-            return None, None
+        params = service_config["query_params"]
+
+        # Each service registers the normalizer matching its return type
+        return service_config["normalize"](
+            service_name, query_func(origin, destination, **params)
+        )
 
     except Exception as e:
         print(f"❌ Error querying {service_name}: {e}")
@@ -112,56 +184,63 @@ def extract_service_data(service_name, service_config, result, size, mode):
         summary = None
 
     num_routes = get_route_count(service_config, result)
-    data = {}
+    keys = COLUMN_KEYS.get((service_name, mode)) or build_column_keys(
+        service_name, mode
+    )
 
     if summary and isinstance(summary, RouteSummary):
         # Use RouteSummary attributes directly
-        data[f"{service_name}_duration_{mode}"] = summary.duration_s
-        data[f"{service_name}_distance_{mode}"] = summary.distance_m
-        data[f"{service_name}_modes_{mode}"] = (
-            "|".join(summary.modes) if summary.modes else ""
-        )
-        data[f"{service_name}_vehicle_lines_{mode}"] = (
-            "|".join(summary.vehicle_lines) if summary.vehicle_lines else ""
-        )
+        data = {
+            keys["duration"]: summary.duration_s,
+            keys["distance"]: summary.distance_m,
+            keys["modes"]: "|".join(summary.modes) if summary.modes else "",
+            keys["vehicle_lines"]: (
+                "|".join(summary.vehicle_lines) if summary.vehicle_lines else ""
+            ),
+        }
     else:
         # Empty values if no summary
-        data[f"{service_name}_duration_{mode}"] = ""
-        data[f"{service_name}_distance_{mode}"] = ""
-        data[f"{service_name}_modes_{mode}"] = ""
-        data[f"{service_name}_vehicle_lines_{mode}"] = ""
+        data = {
+            keys["duration"]: "",
+            keys["distance"]: "",
+            keys["modes"]: "",
+            keys["vehicle_lines"]: "",
+        }
 
     # Add standard fields
-    data[f"{service_name}_response_size_{mode}"] = size if size is not None else 0
-    data[f"{service_name}_num_routes_{mode}"] = num_routes
+    data[keys["response_size"]] = size if size is not None else 0
+    data[keys["num_routes"]] = num_routes
 
     return data
 
 
-def get_headers_for_services(services, mode):
-    """Generate CSV headers for a set of services using RouteSummary attributes."""
-    headers = []
-
-    # Get RouteSummary field names (excluding num_routes as it's handled separately)
-    route_fields = ["duration", "distance", "modes", "vehicle_lines"]
-
-    for service_name in services.keys():
-        # RouteSummary fields
-        for field in route_fields:
-            headers.append(f"{service_name}_{field}_{mode}")
-
-        # Standard fields
-        headers.extend(
-            [
-                f"{service_name}_response_size_{mode}",
-                f"{service_name}_num_routes_{mode}",
-            ]
+def query_services_for_route(services, origin, destination, mode, cache=None):
+    """Query every service for a route and return the combined CSV fields."""
+    data = {}
+    for service_name, service_config in services.items():
+        result, size = query_service_for_mode(
+            service_name, service_config, origin, destination, cache=cache
+        )
+        data.update(
+            extract_service_data(service_name, service_config, result, size, mode)
         )
+    return data
 
-    return headers
+
+@functools.lru_cache(maxsize=None)
+def get_headers_for_services(services_key: tuple, mode: str) -> tuple:
+    """
+    Generate CSV headers for a set of service names using RouteSummary attributes.
+    Results are cached per (services, mode), so pass a tuple of service names.
+    """
+    return tuple(
+        column
+        for service_name in services_key
+        for column in build_column_keys(service_name, mode).values()
+    )
 
 
-def test_transport_routing():
+def test_transport_routing(cache=None):
     """Test transport/transit routing services."""
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -170,83 +249,107 @@ def test_transport_routing():
     # --- The rest of the function is UNCHANGED ---
     mode = "transport"
 
-    headers = ["origin", "destination", "routing_mode"] + get_headers_for_services(
-        TRANSPORT_SERVICES, mode
+    headers = [
+        "origin",
+        "destination",
+        "routing_mode",
+        *get_headers_for_services(tuple(TRANSPORT_SERVICES), mode),
+    ]
+
+    # Duplicate (origin, destination) pairs are only queried once
+    num_unique = len(set(coordinates_list))
+    print(
+        f"🚌 Testing {len(coordinates_list)} transport routes ({num_unique} unique)..."
     )
 
-    print(f"🚌 Testing {len(coordinates_list)} transport routes...")
-
-    for i, (origin, destination) in enumerate(coordinates_list, 1):
-        print(f"\n[{i}/{len(coordinates_list)}] Testing {origin} → {destination}")
-
-        row = {
-            "origin": origin,
-            "destination": destination,
-            "routing_mode": "Public Transport",
-        }
-
-        # Query all transport services
-        for service_name, service_config in TRANSPORT_SERVICES.items():
-            result, size = query_service_for_mode(
-                service_name, service_config, origin, destination
-            )
-            service_data = extract_service_data(
-                service_name, service_config, result, size, mode
-            )
-            row.update(service_data)
-
-        write_result(row, filename=filename, headers=headers)
+    results_by_pair = {}
+    with open_csv_writer(filename, headers) as writer:
+        for i, (origin, destination) in enumerate(coordinates_list, 1):
+            print(f"\n[{i}/{len(coordinates_list)}] Testing {origin} → {destination}")
+
+            if (origin, destination) not in results_by_pair:
+                # Query all transport services
+                results_by_pair[(origin, destination)] = query_services_for_route(
+                    TRANSPORT_SERVICES, origin, destination, mode, cache=cache
+                )
+
+            row = {
+                "origin": origin,
+                "destination": destination,
+                "routing_mode": "Public Transport",
+            }
+            row.update(results_by_pair[(origin, destination)])
+            writer.writerow(row)
 
     print(f"✅ Transport comparison saved to {filename}")
     return filename
 
 
-def test_driving_routing():
+def test_driving_routing(cache=None):
     """Test driving/car routing services."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = DRIVING_COMPARISON_CSV.replace(".csv", f"_{timestamp}.csv")
     mode = "driving"
 
-    headers = ["origin", "destination", "routing_mode"] + get_headers_for_services(
-        DRIVING_SERVICES, mode
-    )
-
-    print(f"🚗 Testing {len(coordinates_list)} driving routes...")
-
-    for _i, (origin, destination) in enumerate(coordinates_list, 1):
-        row = {
-            "origin": origin,
-            "destination": destination,
-            "routing_mode": "Driving",
-        }
-
-        for service_name, service_config in DRIVING_SERVICES.items():
-            result, size = query_service_for_mode(
-                service_name, service_config, origin, destination
-            )
-            service_data = extract_service_data(
-                service_name, service_config, result, size, mode
-            )
-            row.update(service_data)
-
-        write_result(row, filename=filename, headers=headers)
+    headers = [
+        "origin",
+        "destination",
+        "routing_mode",
+        *get_headers_for_services(tuple(DRIVING_SERVICES), mode),
+    ]
+
+    # Duplicate (origin, destination) pairs are only queried once
+    num_unique = len(set(coordinates_list))
+    print(f"🚗 Testing {len(coordinates_list)} driving routes ({num_unique} unique)...")
+
+    results_by_pair = {}
+    with open_csv_writer(filename, headers) as writer:
+        for origin, destination in coordinates_list:
+            if (origin, destination) not in results_by_pair:
+                results_by_pair[(origin, destination)] = query_services_for_route(
+                    DRIVING_SERVICES, origin, destination, mode, cache=cache
+                )
+
+            row = {
+                "origin": origin,
+                "destination": destination,
+                "routing_mode": "Driving",
+            }
+            row.update(results_by_pair[(origin, destination)])
+            writer.writerow(row)
 
     print(f"✅ Driving comparison saved to {filename}")
     return filename
 
 
-def compare_routing_modes():
+def compare_routing_modes(use_cache=USE_CACHE):
     """Compare both transport and driving routing modes."""
+    cache = None
+    if use_cache:
+        os.makedirs(RESULT_DIR, exist_ok=True)
+        cache = shelve.open(ROUTE_CACHE_PATH)
 
-    # Test transport routing
-    if TRANSPORT:
-        transport_file = test_transport_routing()
-        print(f"   Transport: /app/results/{transport_file}")
+    try:
+        # Test transport routing
+        if TRANSPORT:
+            transport_file = test_transport_routing(cache=cache)
+            print(f"   Transport: /app/results/{transport_file}")
 
-    if DRIVE:
-        driving_file = test_driving_routing()
-        print(f"   Driving: /app/results/{driving_file}")
+        if DRIVE:
+            driving_file = test_driving_routing(cache=cache)
+            print(f"   Driving: /app/results/{driving_file}")
+    finally:
+        if cache is not None:
+            cache.sync()
+            cache.close()
 
 
 if __name__ == "__main__":
-    compare_routing_modes()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse service responses cached by previous runs for the same time.",
+    )
+    args = parser.parse_args()
+    compare_routing_modes(use_cache=args.cache)
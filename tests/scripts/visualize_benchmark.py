@@ -4,41 +4,83 @@ container (server-side) and api (client-side) benchmark results, using a
 dynamic configuration loaded from the test suite.
 """
 
-import glob
+import fnmatch
+import gc
+import hashlib
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
 
 from tests.conftest import IMAGES_DIR, RESULT_DIR
 from tests.utils.commons import get_service_config
 
 # --- Configuration ---
-DETAILED_PERFORMANCE_DIR = os.path.join(IMAGES_DIR, "detailed_performance")
-
-# A simple map for service colors and labels
+# Prepared benchmark data is cached as Parquet to skip CSV parsing on re-runs.
+# Bump the version whenever the columns or dtypes of the prepared frame change.
+BENCHMARK_CACHE_DIR = os.path.join(RESULT_DIR, ".cache")
+BENCHMARK_CACHE_VERSION = 2
+
+# Resource columns per benchmark source, mapped to their standardized names
+CONTAINER_RESOURCE_COLUMNS = {
+    "container_cpu_s": "cpu_s",
+    "container_mem_peak_mb": "memory_mb",
+}
+API_RESOURCE_COLUMNS = {"client_cpu_s": "cpu_s", "client_mem_mb_delta": "memory_mb"}
+
+# Cost types in plotting order
+COST_TYPE_DTYPE = pd.CategoricalDtype(["Server-Side", "Client-Side"])
+
+# Service order for the categorical service column
 SERVICE_CONFIG = get_service_config()
 
-# Create a color palette dictionary for seaborn from the dynamic config
-COLOR_PALETTE = {service: config["color"] for service, config in SERVICE_CONFIG.items()}
-
-# Set style for better visualizations
-plt.style.use(
-    "seaborn-v0_8-whitegrid"
-    if "seaborn-v0_8-whitegrid" in plt.style.available
-    else "default"
-)
-
 # --- DATA LOADING AND PREPARATION ---
 
 
 def find_latest_benchmark_file(pattern: str) -> str | None:
     """Finds the most recent file in the result directory matching a pattern."""
-    search_path = os.path.join(RESULT_DIR, pattern)
-    files = glob.glob(search_path)
-    return max(files, key=os.path.getctime) if files else None
+    if not os.path.isdir(RESULT_DIR):
+        return None
+    # One directory pass; DirEntry caches its stat result
+    with os.scandir(RESULT_DIR) as entries:
+        latest = max(
+            (e for e in entries if fnmatch.fnmatchcase(e.name, pattern)),
+            key=lambda e: e.stat().st_ctime,
+            default=None,
+        )
+    return latest.path if latest else None
+
+
+def read_benchmark_csv(path: str, resource_columns: dict) -> pd.DataFrame:
+    """
+    Read only the plotted columns of a benchmark CSV with explicit dtypes,
+    using the multi-threaded pyarrow parser, and rename its resource columns
+    to the standard names.
+    """
+    dtype_map = {"service": "category", "avg_time_ms": "float32"}
+    dtype_map.update(dict.fromkeys(resource_columns, "float32"))
+
+    df = pd.read_csv(path, usecols=list(dtype_map), dtype=dtype_map, engine="pyarrow")
+    return df.rename(columns=resource_columns)
+
+
+def get_cache_path(*source_files: str | None) -> str:
+    """Cache file for the source files and the current prepared-data format."""
+    key = "|".join(
+        [str(BENCHMARK_CACHE_VERSION)]
+        + [os.path.basename(f) if f else "" for f in source_files]
+    )
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(BENCHMARK_CACHE_DIR, f"benchmarks_{digest}.parquet")
+
+
+def is_cache_fresh(cache_path: str, *source_files: str | None) -> bool:
+    """True if the cache exists and is newer than every source file."""
+    if not os.path.isfile(cache_path):
+        return False
+    cache_mtime = os.path.getmtime(cache_path)
+    return all(os.path.getmtime(f) <= cache_mtime for f in source_files if f)
 
 
 def load_and_prepare_data():
@@ -49,195 +91,119 @@ def load_and_prepare_data():
     if not container_file and not api_file:
         raise FileNotFoundError("No benchmark files found in 'reports/' directory.")
 
-    df_container = pd.read_csv(container_file) if container_file else pd.DataFrame()
-    df_api = pd.read_csv(api_file) if api_file else pd.DataFrame()
+    cache_path = get_cache_path(container_file, api_file)
+    if is_cache_fresh(cache_path, container_file, api_file):
+        print(f"📦 Loaded cached benchmark data: {cache_path}")
+        return pd.read_parquet(cache_path)
+
+    df_container = (
+        read_benchmark_csv(container_file, CONTAINER_RESOURCE_COLUMNS)
+        if container_file
+        else pd.DataFrame()
+    )
+    df_api = (
+        read_benchmark_csv(api_file, API_RESOURCE_COLUMNS)
+        if api_file
+        else pd.DataFrame()
+    )
 
     all_dfs = []
     if not df_container.empty:
         print(f"📊 Loaded {len(df_container)} container benchmark records.")
         df_container["cost_type"] = "Server-Side"
-        df_container.rename(
-            columns={"container_cpu_s": "cpu_s", "container_mem_peak_mb": "memory_mb"},
-            inplace=True,
-        )
         all_dfs.append(df_container)
 
     if not df_api.empty:
         print(f"📊 Loaded {len(df_api)} API benchmark records.")
         df_api["cost_type"] = "Client-Side"
-        df_api.rename(
-            columns={"client_cpu_s": "cpu_s", "client_mem_mb_delta": "memory_mb"},
-            inplace=True,
-        )
         all_dfs.append(df_api)
 
-    df_combined = pd.concat(all_dfs, ignore_index=True)
-    df_combined["throughput_rps"] = 1000 / df_combined["avg_time_ms"]
-    return df_combined
-
-
-# --- INDIVIDUAL PLOTTING FUNCTIONS ---
-
-
-def get_label(service_name):
-    """Safely get a service label from the config."""
-    return SERVICE_CONFIG.get(service_name, {"label": service_name.upper()})["label"]
-
-
-def create_response_time_plot(df, ax):
-    """Plots response time distribution."""
-    sns.boxplot(
-        x="service",
-        y="avg_time_ms",
-        data=df,
-        ax=ax,
-        palette=COLOR_PALETTE,
-        hue="service",
-        legend=False,
+    # Share fixed categorical dtypes so concat neither upcasts to object nor
+    # copies; services follow the config order, unknown ones are appended
+    seen = pd.Index([]).append([df["service"].cat.categories for df in all_dfs])
+    service_dtype = pd.CategoricalDtype(
+        list(SERVICE_CONFIG) + [s for s in seen.unique() if s not in SERVICE_CONFIG]
     )
-    ax.set_xticklabels([get_label(s.get_text()) for s in ax.get_xticklabels()])
-    ax.set_title("Response Time Distribution")
-    ax.set_xlabel(None)
-    ax.set_ylabel("Time (ms)")
-
-
-def create_throughput_plot(df, ax):
-    """Plots average throughput."""
-    sns.barplot(
-        x="service",
-        y="throughput_rps",
-        data=df,
-        ax=ax,
-        palette=COLOR_PALETTE,
-        hue="service",
-        legend=False,
-        estimator=np.mean,
-    )
-    ax.set_xticklabels([get_label(s.get_text()) for s in ax.get_xticklabels()])
-    ax.set_title("Average Throughput (Requests/Sec)")
-    ax.set_xlabel(None)
-    ax.set_ylabel("RPS (Higher is Better)")
-
-
-def create_cpu_plot(df, ax):
-    """Plots CPU usage, differentiating server vs. client cost."""
-    sns.barplot(
-        x="service",
-        y="cpu_s",
-        hue="cost_type",
-        data=df,
-        ax=ax,
-        palette="viridis",
-        estimator=np.mean,
-    )
-    ax.set_xticklabels([get_label(s.get_text()) for s in ax.get_xticklabels()])
-    ax.set_title("CPU Usage: Server vs. Client Cost")
-    ax.set_xlabel(None)
-    ax.set_ylabel("CPU Time (s, log scale)")
-    ax.set_yscale("log")
-    ax.legend(title="Cost Type")
-
-
-def create_memory_plot(df, ax):
-    """Plots memory usage, differentiating server vs. client cost."""
-    sns.barplot(
-        x="service",
-        y="memory_mb",
-        hue="cost_type",
-        data=df,
-        ax=ax,
-        palette="magma",
-        estimator=np.mean,
-    )
-    ax.set_xticklabels([get_label(s.get_text()) for s in ax.get_xticklabels()])
-    ax.set_title("Memory Usage: Peak Server vs. Client Delta")
-    ax.set_xlabel(None)
-    ax.set_ylabel("Memory (MB, log scale)")
-    ax.set_yscale("log")
-    ax.legend(title="Cost Type")
-
-
-def create_efficiency_scatter_plot(df, ax):
-    """Creates a scatter plot of CPU vs Memory, using custom markers."""
-    ax.set_title("Resource Efficiency (CPU vs. Memory)")
-    sns.scatterplot(
-        data=df,
-        x="cpu_s",
-        y="memory_mb",
-        hue="service",
-        style="cost_type",
-        palette=COLOR_PALETTE,
-        ax=ax,
-        s=100,  # size of markers
-        alpha=0.8,
-    )
-    ax.set_xlabel("CPU Time (s, log scale)")
-    ax.set_ylabel("Memory (MB, log scale)")
-    ax.set_xscale("log")
-    ax.set_yscale("log")
-    ax.grid(True, which="both", ls="--", linewidth=0.5)
-
+    column_dtypes = {"service": service_dtype, "cost_type": COST_TYPE_DTYPE}
+    all_dfs = [df.astype(column_dtypes) for df in all_dfs]
+    df_combined = pd.concat(all_dfs, ignore_index=True, copy=False)
+    # Release the per-source frames before plotting
+    del df_container, df_api, all_dfs
+    gc.collect()
+
+    # Drop categories without rows so the plots don't reserve empty slots
+    for column in column_dtypes:
+        df_combined[column] = df_combined[column].cat.remove_unused_categories()
+
+    # float32 throughput; rows without a positive response time stay NaN
+    avg_ms = df_combined["avg_time_ms"].to_numpy(dtype=np.float32, copy=False)
+    throughput = np.full_like(avg_ms, np.nan)
+    np.divide(np.float32(1000), avg_ms, out=throughput, where=avg_ms > 0)
+    df_combined["throughput_rps"] = throughput
+
+    # Log-space resource columns for the efficiency scatter plot
+    for column in ("cpu_s", "memory_mb"):
+        values = df_combined[column].to_numpy(dtype=np.float32, copy=False)
+        # Non-positive samples have no logarithm; NaN makes seaborn skip them
+        df_combined[f"log_{column}"] = np.log10(
+            values, out=np.full_like(values, np.nan), where=values > 0
+        )
 
-# --- MAIN DASHBOARD AND SAVING LOGIC ---
+    os.makedirs(BENCHMARK_CACHE_DIR, exist_ok=True)
+    df_combined.to_parquet(cache_path, compression="zstd")
+    return df_combined
 
 
-def save_plot(fig, ax, plot_func, df, filename):
-    """Helper to save a single plot."""
-    plot_func(df, ax)
-    fig.tight_layout()  # Simple layout for single plots
-    plot_path = os.path.join(DETAILED_PERFORMANCE_DIR, filename)
-    fig.savefig(plot_path, dpi=150)
-    plt.close(fig)
+def summarize(df):
+    """
+    Per service and cost type means, computed once and shared by the bar plots.
+    The throughput sample count lets per-service bars weight each group.
+    """
+    return (
+        df.groupby(["service", "cost_type"], observed=True, sort=False)
+        .agg(
+            throughput_rps=("throughput_rps", "mean"),
+            throughput_rps_count=("throughput_rps", "count"),
+            cpu_s=("cpu_s", "mean"),
+            memory_mb=("memory_mb", "mean"),
+        )
+        .reset_index()
+    )
 
 
 def main():
     """Load, analyze, and visualize benchmark data."""
     try:
         print("🚀 Starting benchmark analysis...")
-        os.makedirs(IMAGES_DIR, exist_ok=True)
-        os.makedirs(DETAILED_PERFORMANCE_DIR, exist_ok=True)
-
         df = load_and_prepare_data()
+        summary = summarize(df)
 
-        # Define all plots and their creation functions
-        plot_definitions = {
-            "01_response_time.png": create_response_time_plot,
-            "02_throughput.png": create_throughput_plot,
-            "03_cpu_usage.png": create_cpu_plot,
-            "04_memory_usage.png": create_memory_plot,
-            "05_efficiency_scatter.png": create_efficiency_scatter_plot,
-        }
+        # Plotting libraries are only loaded once there is something to plot
+        from tests.scripts import _benchmark_plots as plots
 
-        # --- Create Main Dashboard ---
-        fig, axes = plt.subplots(3, 2, figsize=(15, 15))
-        fig.suptitle(
-            "Routing Services Performance Dashboard", fontsize=16, fontweight="bold"
-        )
-        flat_axes = axes.flatten()
-
-        for i, (_filename, plot_func) in enumerate(plot_definitions.items()):
-            if i < len(flat_axes):
-                plot_func(df, flat_axes[i])
-
-        for i in range(len(plot_definitions), len(flat_axes)):
-            flat_axes[i].set_visible(False)
-
-        # Apply the corrected tight_layout call for the dashboard
-        plt.tight_layout(rect=(0, 0.03, 1, 0.95))
-        dashboard_path = os.path.join(IMAGES_DIR, "performance_dashboard.png")
-        plt.savefig(dashboard_path, dpi=150)
-        plt.close(fig)
-        print(f"✅ Performance dashboard saved: {dashboard_path}")
+        os.makedirs(IMAGES_DIR, exist_ok=True)
+        os.makedirs(plots.DETAILED_PERFORMANCE_DIR, exist_ok=True)
 
         # --- Save Detailed Plots ---
-        for filename, plot_func in plot_definitions.items():
-            fig_single, ax_single = plt.subplots(figsize=(8, 6))
-            save_plot(fig_single, ax_single, plot_func, df, filename)
+        # Each figure is independent, so render them in parallel processes
+        max_workers = min(len(plots.PLOT_DEFINITIONS), os.cpu_count() or 1)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=plots.init_plot_worker,
+            initargs=(df, summary),
+        ) as executor:
+            list(executor.map(plots.save_detailed_plot, plots.PLOT_DEFINITIONS))
 
         print(
-            f"✅ {len(plot_definitions)} detailed plots saved in: {DETAILED_PERFORMANCE_DIR}"
+            f"✅ {len(plots.PLOT_DEFINITIONS)} detailed plots saved in: {plots.DETAILED_PERFORMANCE_DIR}"
         )
 
+        # --- Create Main Dashboard ---
+        # Composed from the saved plots instead of rendering everything twice
+        dashboard_path = os.path.join(IMAGES_DIR, "performance_dashboard.png")
+        plots.compose_dashboard(dashboard_path)
+        print(f"✅ Performance dashboard saved: {dashboard_path}")
+
     except FileNotFoundError as e:
         print(f"❌ {e}")
         print("💡 Run benchmark tests first using `pytest`.")
@@ -4,7 +4,7 @@ visualizing data. Generates a main dashboard and saves each subplot
 individually to a dedicated subfolder.
 """
 
-import glob
+import fnmatch
 import os
 from datetime import datetime
 
@@ -21,14 +21,84 @@ ROUTING_DETAILS_DIR = os.path.join(IMAGES_DIR, "routing_details")
 SERVICE_CONFIG = get_service_config()
 COLOR_PALETTE = {k: v["color"] for k, v in SERVICE_CONFIG.items()}
 
+# Plots are only written to disk: no GUI backend, and simplified bar paths
+plt.switch_backend("Agg")
+plt.rcParams.update(
+    {
+        "font.family": "DejaVu Sans",
+        "path.simplify": True,
+        "path.simplify_threshold": 1.0,
+        "agg.path.chunksize": 10000,
+    }
+)
+
+# Services compared per routing mode and the per-service metrics that are plotted
+TRANSPORT_SERVICES = ["motis", "google"]
+DRIVING_SERVICES = ["google"]
+ROUTE_METRICS = ["duration", "distance", "num_routes", "response_size"]
+
+# Plotted column and unit divisor per metric (None keeps the raw values)
+METRIC_COLUMNS = {
+    "duration": ("duration_min", 60),
+    "distance": ("distance_km", 1000),
+    "num_routes": ("num_routes", None),
+    "response_size": ("response_size_kb", 1024),
+}
+
 # --- 1. Data Loading and Preparation ---
 
 
 def find_latest_file(pattern: str) -> str | None:
     """Finds the most recent file in the result directory matching a pattern."""
-    search_path = os.path.join(RESULT_DIR, pattern)
-    files = glob.glob(search_path)
-    return max(files, key=os.path.getctime) if files else None
+    if not os.path.isdir(RESULT_DIR):
+        return None
+    # One directory pass; DirEntry caches its stat result
+    with os.scandir(RESULT_DIR) as entries:
+        latest = max(
+            (
+                e
+                for e in entries
+                if e.is_file() and fnmatch.fnmatchcase(e.name, pattern)
+            ),
+            key=lambda e: e.stat().st_ctime,
+            default=None,
+        )
+    return latest.path if latest else None
+
+
+def get_columns(services, mode):
+    """Columns of a comparison CSV that are needed for plotting."""
+    return ["origin", "destination"] + [
+        f"{service}_{metric}_{mode}" for service in services for metric in ROUTE_METRICS
+    ]
+
+
+def melt_services(df, services, mode, routing_mode):
+    """
+    Reshape one wide comparison frame into a long frame with a row per service.
+    Each output column is preallocated and filled with one slice per service.
+    """
+    n_rows = len(df)
+    n_total = n_rows * len(services)
+    route_labels = df["origin"].str.cat(df["destination"], sep="|").to_numpy()
+
+    columns = {
+        "service": np.repeat(np.array(services, dtype=object), n_rows),
+        "routing_mode": np.full(n_total, routing_mode, dtype=object),
+        "route_label": np.tile(route_labels, len(services)),
+    }
+    for metric, (column, divisor) in METRIC_COLUMNS.items():
+        sources = [df[f"{service}_{metric}_{mode}"].to_numpy() for service in services]
+        values = np.empty(
+            n_total, dtype=np.float32 if divisor else np.result_type(*sources)
+        )
+        for i, source in enumerate(sources):
+            values[i * n_rows : (i + 1) * n_rows] = (
+                source / divisor if divisor else source
+            )
+        columns[column] = values
+
+    return pd.DataFrame(columns)
 
 
 def load_and_prepare_data():
@@ -41,54 +111,38 @@ def load_and_prepare_data():
             "No comparison CSV files found in 'reports/' directory."
         )
 
-    processed_rows = []
+    processed_frames = []
 
     # Process Transport Data
     if transport_file:
-        df_transport = pd.read_csv(transport_file)
+        df_transport = pd.read_csv(
+            transport_file, usecols=get_columns(TRANSPORT_SERVICES, "transport")
+        )
         print(f"📊 Loaded {len(df_transport)} public transport records.")
-        for _, row in df_transport.iterrows():
-            route_identifier = f"{row['origin']}|{row['destination']}"
-            for service in ["motis", "google"]:
-                processed_rows.append(
-                    {
-                        "service": service,
-                        "routing_mode": "Public Transport",
-                        "route_label": route_identifier,
-                        "duration_min": row[f"{service}_duration_transport"] / 60,
-                        "distance_km": row[f"{service}_distance_transport"] / 1000,
-                        "num_routes": row[f"{service}_num_routes_transport"],
-                        "response_size_kb": row[f"{service}_response_size_transport"]
-                        / 1024,
-                    }
-                )
+        processed_frames.append(
+            melt_services(
+                df_transport, TRANSPORT_SERVICES, "transport", "Public Transport"
+            )
+        )
 
     # Process Driving Data
     if driving_file:
-        df_driving = pd.read_csv(driving_file)
+        df_driving = pd.read_csv(
+            driving_file, usecols=get_columns(DRIVING_SERVICES, "driving")
+        )
         print(f"🚗 Loaded {len(df_driving)} driving records.")
-        for _, row in df_driving.iterrows():
-            route_identifier = f"{row['origin']}|{row['destination']}"
-            processed_rows.append(
-                {
-                    "service": "google",
-                    "routing_mode": "Driving",
-                    "route_label": route_identifier,
-                    "duration_min": row["google_duration_driving"] / 60,
-                    "distance_km": row["google_distance_driving"] / 1000,
-                    "num_routes": row["google_num_routes_driving"],
-                    "response_size_kb": row["google_response_size_driving"] / 1024,
-                }
-            )
+        processed_frames.append(
+            melt_services(df_driving, DRIVING_SERVICES, "driving", "Driving")
+        )
 
-    if not processed_rows:
-        return pd.DataFrame()
-    df_final = pd.DataFrame(processed_rows)
+    df_final = pd.concat(processed_frames, ignore_index=True)
 
     if not df_final.empty:
-        unique_route_ids = pd.unique(df_final["route_label"])
-        route_map = {long_id: f"{i+1}" for i, long_id in enumerate(unique_route_ids)}
-        df_final["route_label"] = df_final["route_label"].map(route_map)
+        # Number routes in order of first appearance, stored as a categorical
+        codes, uniques = pd.factorize(df_final["route_label"])
+        df_final["route_label"] = pd.Categorical.from_codes(
+            codes, categories=[str(i + 1) for i in range(len(uniques))]
+        )
 
     return df_final
 
@@ -103,14 +157,28 @@ def plot_barplot(df, ax, y_metric, title, ylabel, **plot_kwargs):
     """
     # **plot_kwargs will now contain {'hue': 'service', 'palette': ...} for transport
     # or {'color': ...} for driving. This is passed directly to seaborn.
+    # Average repeated routes with one pandas groupby; seaborn only draws the bars
+    group_cols = ["route_label"]
+    if "hue" in plot_kwargs:
+        group_cols.append(plot_kwargs["hue"])
+    means = df.groupby(group_cols, sort=False, observed=True, as_index=False)[
+        y_metric
+    ].mean()
+    # Routes of the other routing mode must not leave empty slots on the x-axis
+    means["route_label"] = means["route_label"].cat.remove_unused_categories()
     sns.barplot(
-        data=df, x="route_label", y=y_metric, ax=ax, estimator=np.mean, **plot_kwargs
+        data=means, x="route_label", y=y_metric, ax=ax, errorbar=None, **plot_kwargs
     )
+    # Bars are composited as one raster layer; axes and labels stay vector
+    for patch in ax.patches:
+        patch.set_rasterized(True)
 
     ax.set_title(title)
     ax.set_ylabel(ylabel)
     ax.set_xlabel(None)  # X-label is set on the figure level
-    ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha="right")
+    # Rotate the existing tick labels in place instead of re-setting them
+    ax.tick_params(axis="x", labelrotation=45)
+    plt.setp(ax.get_xticklabels(), ha="right")
 
     ax.grid(True, linestyle="--", alpha=0.6)
 
@@ -152,20 +220,22 @@ def save_detailed_plots(df, plot_definitions, filename_prefix):
     subfolder_path = os.path.join(ROUTING_DETAILS_DIR, filename_prefix)
     os.makedirs(subfolder_path, exist_ok=True)
 
+    # One figure is reused for every metric; only the axes are cleared
+    fig, ax = plt.subplots(figsize=(10, 6))
     for i, (plot_func, kwargs) in enumerate(plot_definitions):
-        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.clear()
         plot_func(df, ax, **kwargs)
         ax.set_xlabel("Route")  # Add x-label to single plots
 
-        plt.tight_layout()
+        fig.tight_layout()
 
         # Use a descriptive name based on the plotted metric
         metric_name = kwargs.get("y_metric", f"plot_{i+1}")
         filename = f"{i+1:02d}_{metric_name}.png"
         save_path = os.path.join(subfolder_path, filename)
 
-        plt.savefig(save_path, dpi=150)
-        plt.close()
+        fig.savefig(save_path, dpi=150)
+    plt.close(fig)
 
     print(f"✅ Detailed plots for '{filename_prefix}' saved in: {subfolder_path}")
 
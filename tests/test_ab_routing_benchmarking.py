@@ -66,9 +66,11 @@ def test_api_service_benchmark(benchmark, coord, service, api_benchmark_reporter
     origin, destination = coord
     payload = service["payload_builder"](origin=origin, destination=destination)
 
-    # Use the original workflow that works with immutable objects
+    # Keep the last benchmarked result so validation needs no extra request
+    latest = {}
+
     def benchmark_target():
-        service["query_func"](
+        latest["result"] = service["query_func"](
             client=service["client"],
             endpoint=service["endpoint"],
             payload=payload,
@@ -77,13 +79,8 @@ def test_api_service_benchmark(benchmark, coord, service, api_benchmark_reporter
 
     benchmark.pedantic(target=benchmark_target, rounds=5, iterations=1, warmup_rounds=1)
 
-    # Get a single result for validation
-    result: ServiceMetrics = service["query_func"](
-        client=service["client"],
-        endpoint=service["endpoint"],
-        payload=payload,
-        method=service["method"],
-    )
+    # Validate the result of the last benchmark round
+    result: ServiceMetrics = latest["result"]
 
     # Validate and Report (using your original result builder)
     assert result and result.status_code == 200
@@ -248,20 +248,27 @@ def measure_container_performance(
     )
 
 
+# pytest-benchmark stats (in seconds) reported as milliseconds, in column order
+LATENCY_STAT_KEYS = ("mean", "min", "max", "median", "stddev")
+
+
 def _build_base_result(service, origin, dest, latency_stats):
     """
     Builds the dictionary of common fields derived from pytest-benchmark stats.
     This is a private helper function.
     """
+    mean_ms, min_ms, max_ms, median_ms, stddev_ms = (
+        latency_stats[key] * 1000 for key in LATENCY_STAT_KEYS
+    )
     return {
         "service": service["name"],
         "origin": origin,
         "destination": dest if dest is not None else "",
-        "avg_time_ms": f"{latency_stats['mean'] * 1000:.3f}",
-        "min_time_ms": f"{latency_stats['min'] * 1000:.3f}",
-        "max_time_ms": f"{latency_stats['max'] * 1000:.3f}",
-        "median_time_ms": f"{latency_stats['median'] * 1000:.3f}",
-        "stddev_time_ms": f"{latency_stats['stddev'] * 1000:.3f}",
+        "avg_time_ms": f"{mean_ms:.3f}",
+        "min_time_ms": f"{min_ms:.3f}",
+        "max_time_ms": f"{max_ms:.3f}",
+        "median_time_ms": f"{median_ms:.3f}",
+        "stddev_time_ms": f"{stddev_ms:.3f}",
         "rounds": latency_stats["rounds"],
     }
 
@@ -274,8 +281,8 @@ def build_api_result_row(
     base_row = _build_base_result(service, origin, dest, benchmark_stats)
 
     # Calculate average time for ratios
-    avg_time_ms = benchmark_stats["mean"] * 1000
     avg_time_s = benchmark_stats["mean"]
+    avg_time_ms = avg_time_s * 1000
 
     # Add the fields specific to the API/client-side measurement
     api_specific_fields = {
@@ -296,8 +303,8 @@ def build_api_result_row(
             f"{result.cpu_s / avg_time_s:.4f}" if avg_time_s > 0 else "0.0000"
         ),
         "cv_percent": (
-            f"{(benchmark_stats['stddev'] / benchmark_stats['mean']) * 100:.2f}"
-            if benchmark_stats["mean"] > 0
+            f"{benchmark_stats['stddev'] / avg_time_s * 100:.2f}"
+            if avg_time_s > 0
             else "0.00"
         ),
     }
@@ -319,8 +326,8 @@ def build_container_result_row(
     base_row = _build_base_result(service, origin, dest, latency_stats)
 
     # Calculate average time in ms for ratios to avoid division by zero
-    avg_time_ms = latency_stats["mean"] * 1000
     avg_time_s = latency_stats["mean"]
+    avg_time_ms = avg_time_s * 1000
 
     # Add ALL the fields specific to the container measurement
     container_specific_fields = {
@@ -346,8 +353,8 @@ def build_container_result_row(
             else "0.0000"
         ),
         "cv_percent": (
-            f"{(latency_stats['stddev'] / latency_stats['mean']) * 100:.2f}"
-            if latency_stats["mean"] > 0
+            f"{latency_stats['stddev'] / avg_time_s * 100:.2f}"
+            if avg_time_s > 0
             else "0.00"
         ),
     }
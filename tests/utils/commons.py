@@ -35,8 +35,13 @@ app = FastAPI()
 app.include_router(router)
 client = TestClient(app)
 
-# httpx client for external APIs
-external_client = httpx.Client()
+# Shared httpx client for external APIs, so calls reuse keep-alive connections
+external_client = httpx.Client(
+    transport=httpx.HTTPTransport(
+        retries=3,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+    )
+)
 
 
 def get_test_coordinates(name):
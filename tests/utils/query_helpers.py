@@ -7,7 +7,7 @@ import polyline
 
 from src.core.config import settings
 from tests.conftest import TIME_BENCH
-from tests.utils.commons import client
+from tests.utils.commons import client, external_client
 from tests.utils.models import QueryResult, RouteSummary
 from tests.utils.payload_builders import (
     google_payload,
@@ -263,6 +263,7 @@ def query_google(
     mode="transit",
     time=TIME_BENCH,
     api_key=str(settings.GOOGLE_API_KEY),
+    http_client: httpx.Client = external_client,
 ) -> QueryResult:
     """Query Google Directions API and return standardized result."""
 
@@ -270,12 +271,11 @@ def query_google(
     url = str(settings.GOOGLE_DIRECTIONS_URL)
 
     def make_request():
-        with httpx.Client() as client_http:
-            response = client_http.get(url, params=params)
-            response.raise_for_status()
-            response_size = len(response.content)
-            data = response.json()
-            return data, response_size
+        response = http_client.get(url, params=params)
+        response.raise_for_status()
+        response_size = len(response.content)
+        data = response.json()
+        return data, response_size
 
     try:
         data, response_size = retry_api_call(make_request)
@@ -391,6 +391,7 @@ def query_valhalla(
     destination: str,
     costing: str = "multimodal",
     endpoint: Optional[str] = None,
+    http_client: httpx.Client = external_client,
     **kwargs,
 ) -> QueryResult:
     """Query Valhalla API and return standardized result."""
@@ -406,12 +407,11 @@ def query_valhalla(
         url = settings.VALHALLA_URL
 
     try:
-        with httpx.Client() as client:
-            response = client.post(url, json=payload)
-            response.raise_for_status()
-            response_size = len(response.content)
-            data = response.json()
-            return QueryResult.success_result(data, response_size)
+        response = http_client.post(url, json=payload)
+        response.raise_for_status()
+        response_size = len(response.content)
+        data = response.json()
+        return QueryResult.success_result(data, response_size)
     except Exception as e:
         error_msg = f"Error calling Valhalla API for {origin} -> {destination}: {e}"
         print(error_msg)
@@ -475,6 +475,7 @@ def query_otp(
     destination,
     transport_modes: list[str] = ["TRANSIT", "WALK"],
     endpoint: str = str(settings.OPEN_TRIP_PLANNER_URL),
+    http_client: httpx.Client = external_client,
 ) -> QueryResult:
     """Query OpenTripPlanner GraphQL API and return standardized result."""
     origin_str = f"{origin[0]},{origin[1]}"
@@ -483,22 +484,21 @@ def query_otp(
     payload = otp_payload(origin_str, destination_str, transport_modes=transport_modes)
 
     try:
-        with httpx.Client() as client_http:
-            response = client_http.post(
-                endpoint,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            response.raise_for_status()
-            data = response.json()
-            http_status = response.status_code
-            response_size = len(response.content)
+        response = http_client.post(
+            endpoint,
+            json=payload,
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+        data = response.json()
+        http_status = response.status_code
+        response_size = len(response.content)
 
-            if "errors" in data:
-                return QueryResult.error_result(
-                    f"GraphQL errors in response:  {data['errors']}"
-                )
-            return QueryResult.success_result(data, response_size, http_status)
+        if "errors" in data:
+            return QueryResult.error_result(
+                f"GraphQL errors in response:  {data['errors']}"
+            )
+        return QueryResult.success_result(data, response_size, http_status)
 
     except httpx.HTTPError as e:
         return QueryResult.error_result(f"HTTP Error: {e}")
@@ -507,25 +507,26 @@ def query_otp(
 
 
 def query_otp_by_payload(
-    payload, endpoint: str = str(settings.OPEN_TRIP_PLANNER_URL)
+    payload,
+    endpoint: str = str(settings.OPEN_TRIP_PLANNER_URL),
+    http_client: httpx.Client = external_client,
 ) -> QueryResult:
     """Query OTP GraphQL API with given payload and return standardized result."""
     try:
-        with httpx.Client() as client_http:
-            response = client_http.post(
-                endpoint,
-                json=payload,
-                headers={"Content-Type": "application/json"},
+        response = http_client.post(
+            endpoint,
+            json=payload,
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+        data = response.json()
+        http_status = response.status_code
+        response_size = len(response.content)
+        if "errors" in data:
+            return QueryResult.error_result(
+                f"GraphQL errors in response:  {data['errors']}"
             )
-            response.raise_for_status()
-            data = response.json()
-            http_status = response.status_code
-            response_size = len(response.content)
-            if "errors" in data:
-                return QueryResult.error_result(
-                    f"GraphQL errors in response:  {data['errors']}"
-                )
-            return QueryResult.success_result(data, response_size, http_status)
+        return QueryResult.success_result(data, response_size, http_status)
 
     except httpx.HTTPError as e:
         return QueryResult.error_result(f"HTTP Error: {e}")